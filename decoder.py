@@ -1,5 +1,50 @@
 import re
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+def _take_fields(sentence, first, count):
+    """
+    Return `count` comma-separated fields starting at field index `first`.
+    Walks the sentence with str.index so only the needed fields are sliced.
+    """
+    pos = 0
+    for _ in range(first):
+        pos = sentence.index(',', pos) + 1
+    fields = []
+    for _ in range(count):
+        end = sentence.index(',', pos)
+        fields.append(sentence[pos:end])
+        pos = end + 1
+    return fields
+
+@njit(cache=True)
+def _convert(lat_raw, lon_raw, south, west):
+    """
+    Convert raw (D)DDMM.MMMM values to signed decimal degrees.
+    Kept free of string handling so Numba can compile it when installed.
+    """
+    lat_deg = int(lat_raw / 100)
+    lat = lat_deg + (lat_raw - lat_deg * 100) / 60
+    lon_deg = int(lon_raw / 100)
+    lon = lon_deg + (lon_raw - lon_deg * 100) / 60
+    if south:
+        lat = -lat
+    if west:
+        lon = -lon
+    return lat, lon
+
+# Sentence header -> index of its latitude field (lat, N/S, lon, E/W follow)
+_LAT_FIELD = {
+    '$GPGGA': 2,  # $GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47
+    '$GPRMC': 3,  # $GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A
+}
+
 def nmea_to_coords(nmea_sentence, default_alt=3):
     """
     Convert NMEA sentence to [lat, lon, alt].
@@ -7,28 +52,14 @@ def nmea_to_coords(nmea_sentence, default_alt=3):
     Returns None if parsing fails.
     """
     try:
-        if nmea_sentence.startswith('$GPGGA'):
-            # Example: $GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47
-            parts = nmea_sentence.split(',')
-            lat = float(parts[2][:2]) + float(parts[2][2:]) / 60  # DDMM.MMMM → Decimal degrees
-            if parts[3] == 'S':
-                lat *= -1
-            lon = float(parts[4][:3]) + float(parts[4][3:]) / 60   # DDDMM.MMMM → Decimal degrees
-            if parts[5] == 'W':
-                lon *= -1
-            return [round(lat, 6), round(lon, 6), default_alt]
-        
-        elif nmea_sentence.startswith('$GPRMC'):
-            # Example: $GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W*6A
-            parts = nmea_sentence.split(',')
-            lat = float(parts[3][:2]) + float(parts[3][2:]) / 60
-            if parts[4] == 'S':
-                lat *= -1
-            lon = float(parts[5][:3]) + float(parts[5][3:]) / 60
-            if parts[6] == 'W':
-                lon *= -1
-            return [round(lat, 6), round(lon, 6), default_alt]
-        
-    except (IndexError, ValueError, AttributeError):
+        first = _LAT_FIELD.get(nmea_sentence[:6])
+        if first is None:
+            return None
+
+        lat_s, ns, lon_s, ew = _take_fields(nmea_sentence, first, 4)
+        lat, lon = _convert(float(lat_s), float(lon_s), ns == 'S', ew == 'W')
+        return [round(lat, 6), round(lon, 6), default_alt]
+
+    except (IndexError, ValueError, AttributeError, TypeError):
         pass
     return None  # Failed to parse
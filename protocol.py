@@ -0,0 +1,49 @@
+import socket
+try:
+    from socket import TCP_USER_TIMEOUT
+except ImportError:  # Linux only
+    TCP_USER_TIMEOUT = None
+import struct
+
+# Wire format shared by the senders and the receivers
+MSG_FORMAT = "!4siifd"  # sync(4 bytes), lat(int32), lon(int32), alt(float), timestamp(double)
+MSG_STRUCT = struct.Struct(MSG_FORMAT)  # Compiled once, reused per packet
+MSG_SIZE = MSG_STRUCT.size  # 24 bytes
+SYNC = b"GPS\x01"  # Frame marker, lets the receiver resync with bytes.find
+COORD_SCALE = 10_000_000  # lat/lon travel as int32 units of 1e-7 degree (~1 cm)
+RECEIVER_PORT = 40739
+TRANSPORT = "tcp"  # "udp" sends fixes as datagrams; a lost fix is simply superseded by the next
+DATAGRAM_SIZE = 1440 // MSG_SIZE * MSG_SIZE  # Whole frames per UDP datagram, under a typical MTU
+
+# Sender socket tuning
+SOCKET_SNDBUF = 4 * 1024 * 1024  # Room to queue bursts while the link stalls
+CONNECT_TIMEOUT = 5  # Seconds to reach the receiver before retrying, instead of ~2 minutes of SYN retries
+SEND_USER_TIMEOUT_MS = 5000  # A link with data unacknowledged this long is dead (Linux TCP_USER_TIMEOUT)
+RECONNECT_DELAY = 1  # Seconds before the first reconnect attempt, doubled per failure
+RECONNECT_MAX_DELAY = 30
+
+def pack_message(lat, lon, alt, timestamp):
+    """Pack one GPS fix into a MSG_SIZE-byte frame"""
+    return MSG_STRUCT.pack(SYNC, round(lat * COORD_SCALE), round(lon * COORD_SCALE), alt, timestamp)
+
+def connect(host):
+    """Open a tuned socket to the receiver at `host` over TRANSPORT"""
+    udp = TRANSPORT == "udp"
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM if udp else socket.SOCK_STREAM)
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SNDBUF)
+        if not udp and TCP_USER_TIMEOUT is not None:
+            # The next send after a dead link times out fails, which triggers a reconnect
+            s.setsockopt(socket.IPPROTO_TCP, TCP_USER_TIMEOUT, SEND_USER_TIMEOUT_MS)
+        s.settimeout(CONNECT_TIMEOUT)
+        s.connect((host, RECEIVER_PORT))  # For UDP this just fixes the destination
+        # Blocking sends: a slow but live link delays sendall instead of tearing the connection down
+        s.settimeout(None)
+        if not udp:
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Send each small frame immediately
+            # Abort on close instead of lingering over unsent, already stale fixes
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    except OSError:
+        s.close()
+        raise
+    return s
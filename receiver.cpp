@@ -5,6 +5,7 @@
 #include <cstring>
 #include <sys/socket.h>
 #include <netinet/in.h>
+#include <netinet/tcp.h>
 #include <unistd.h>
 #include <cmath>
 #include <algorithm>
@@ -12,12 +13,22 @@
 #include <arpa/inet.h>
 #include <endian.h>
 #include <string>
+#include <numeric>
+#include <limits>
 
 // Constants
 const int PORT = 40739;
 const std::string IP = "172.16.18.74";
-const int MSG_SIZE = 24;  // 4+4+4+8 bytes (3 floats + 1 double)
+const int MSG_SIZE = 24;  // 4+4+4+4+8 bytes (sync word + 2 int32 coords + 1 float + 1 double)
+const double COORD_SCALE = 1e7;  // lat/lon arrive as int32 units of 1e-7 degree
+const char SYNC[] = {'G', 'P', 'S', '\x01'};  // Frame marker at the start of every message
+const int SYNC_SIZE = sizeof(SYNC);
 const int DELAY_WINDOW = 5;
+const int SOCKET_RCVBUF = 12 * 1024 * 1024;  // Needs net.core.rmem_max >= 12582912
+const int LISTEN_BACKLOG = 8;
+const int RECV_SIZE = 65536;  // Bytes per read(); drains many messages per syscall
+const size_t RECV_BUFFER_SIZE = 4 * RECV_SIZE;  // Preallocated buffer that read() fills directly
+const size_t BUFFER_COMPACT_THRESHOLD = RECV_BUFFER_SIZE / 2;  // Move unread bytes to the front past this
 
 // Global metrics
 struct {
@@ -26,20 +37,26 @@ struct {
     double max_delay = 0.0;
     double min_delay = std::numeric_limits<double>::infinity();
     std::deque<double> delay_history;
-    std::vector<char> buffer;
+    std::vector<char> buffer = std::vector<char>(RECV_BUFFER_SIZE);
+    size_t buffer_head = 0;  // Bytes [buffer_head, buffer_tail) are unread
+    size_t buffer_tail = 0;
     size_t total_bytes = 0;
 } metrics;
 
 struct GPSData {
-    float lat;
-    float lon;
+    double lat;
+    double lon;
     float alt;
     double timestamp;
 };
 
 // Function declarations
 void clear_screen();
-GPSData unpack_data(const char* data);
+int32_t read_be_int32(const char* p);
+float read_be_float(const char* p);
+double read_be_double(const char* p);
+GPSData unpack_data(const char* buffer, size_t offset);
+void compact_buffer();
 void display(const GPSData& data, double current_delay, double avg_delay, 
              const std::string& old_coords, const sockaddr_in& client_addr);
 double calculate_latency(double sent_ts);
@@ -54,25 +71,50 @@ void clear_screen() {
     std::cout << "\033[2J\033[1;1H";  // ANSI escape codes
 }
 
-GPSData unpack_data(const char* data) {
+int32_t read_be_int32(const char* p) {
+    uint32_t bits;
+    memcpy(&bits, p, 4);
+    return static_cast<int32_t>(ntohl(bits));
+}
+
+float read_be_float(const char* p) {
+    // Swap the raw bits to host order, then reinterpret them as a float
+    uint32_t bits;
+    memcpy(&bits, p, 4);
+    bits = ntohl(bits);
+    float value;
+    memcpy(&value, &bits, 4);
+    return value;
+}
+
+double read_be_double(const char* p) {
+    uint64_t bits;
+    memcpy(&bits, p, 8);
+    bits = be64toh(bits);
+    double value;
+    memcpy(&value, &bits, 8);
+    return value;
+}
+
+GPSData unpack_data(const char* buffer, size_t offset) {
+    // Decode in place at `offset`, skipping the sync word; no temporary copy
+    const char* data = buffer + offset;
     GPSData result;
-    
-    // Copy and convert network byte order to host
-    uint32_t temp;
-    memcpy(&temp, data, 4);
-    result.lat = ntohl(temp);
-    memcpy(&temp, data+4, 4);
-    result.lon = ntohl(temp);
-    memcpy(&temp, data+8, 4);
-    result.alt = ntohl(temp);
-    
-    uint64_t timestamp_temp;
-    memcpy(&timestamp_temp, data+12, 8);
-    result.timestamp = be64toh(timestamp_temp);
-    
+    result.lat = read_be_int32(data + 4) / COORD_SCALE;
+    result.lon = read_be_int32(data + 8) / COORD_SCALE;
+    result.alt = read_be_float(data + 12);
+    result.timestamp = read_be_double(data + 16);
     return result;
 }
 
+void compact_buffer() {
+    // Move the unread bytes to the front of the buffer
+    size_t unread = metrics.buffer_tail - metrics.buffer_head;
+    memmove(metrics.buffer.data(), metrics.buffer.data() + metrics.buffer_head, unread);
+    metrics.buffer_head = 0;
+    metrics.buffer_tail = unread;
+}
+
 void display(const GPSData& data, double current_delay, double avg_delay,
              const std::string& old_coords, const sockaddr_in& client_addr) {
     clear_screen();
@@ -82,14 +124,15 @@ void display(const GPSData& data, double current_delay, double avg_delay,
     
     auto now = std::chrono::system_clock::now();
     auto ts = std::chrono::system_clock::to_time_t(now);
+    size_t unread = metrics.buffer_tail - metrics.buffer_head;
     
     std::cout << "\n        GPS DATA RECEIVER (C++)"
               << "\n        -------------------------------------"
               << "\n        | Connected To: " << client_ip << ":" << ntohs(client_addr.sin_port)
               << "\n        | Bytes Received: " << metrics.total_bytes
-              << "\n        | Buffer: " << metrics.buffer.size() << " bytes"
-              << "\n        | Queued Messages: " << metrics.buffer.size() / MSG_SIZE
-              << "\n        | Partial Message: " << metrics.buffer.size() % MSG_SIZE << " bytes"
+              << "\n        | Buffer: " << unread << " bytes"
+              << "\n        | Queued Messages: " << unread / MSG_SIZE
+              << "\n        | Partial Message: " << unread % MSG_SIZE << " bytes"
               << "\n        -------------------------------------"
               << "\n        | Last Timestamp: " << std::put_time(std::localtime(&ts), "%H:%M:%S")
               << "\n        | Current Delay: " << std::fixed << std::setprecision(2) << current_delay << "ms"
@@ -120,12 +163,17 @@ void start_receiver() {
         exit(EXIT_FAILURE);
     }
     
-    // Set socket options
-    if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR | SO_REUSEPORT, &opt, sizeof(opt))) {
+    // Set socket options; no SO_REUSEPORT, so a second instance fails to bind instead of sharing the port
+    if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR, &opt, sizeof(opt))) {
         perror("setsockopt");
         exit(EXIT_FAILURE);
     }
     
+    // Accepted connections inherit these, so set them before listen()
+    int rcvbuf = SOCKET_RCVBUF;
+    setsockopt(server_fd, SOL_SOCKET, SO_RCVBUF, &rcvbuf, sizeof(rcvbuf));
+    setsockopt(server_fd, IPPROTO_TCP, TCP_NODELAY, &opt, sizeof(opt));
+    
     address.sin_family = AF_INET;
     address.sin_addr.s_addr = INADDR_ANY;
     address.sin_port = htons(PORT);
@@ -137,7 +185,7 @@ void start_receiver() {
     }
     
     // Listen for connections
-    if (listen(server_fd, 3) < 0) {
+    if (listen(server_fd, LISTEN_BACKLOG) < 0) {
         perror("listen");
         exit(EXIT_FAILURE);
     }
@@ -156,19 +204,36 @@ void start_receiver() {
     std::deque<double> delay_avg;
     
     while (true) {
-        char buffer[1024];
-        int valread = read(new_socket, buffer, sizeof(buffer));
+        if (metrics.buffer_tail + RECV_SIZE > RECV_BUFFER_SIZE) {
+            compact_buffer();
+        }
+        
+        // Read straight into the free tail of the buffer, no staging copy
+        int valread = read(new_socket, metrics.buffer.data() + metrics.buffer_tail, RECV_SIZE);
         
         if (valread <= 0) {
             break;  // Connection closed or error
         }
         
         metrics.total_bytes += valread;
-        metrics.buffer.insert(metrics.buffer.end(), buffer, buffer + valread);
+        metrics.buffer_tail += valread;
         
-        while (metrics.buffer.size() >= MSG_SIZE) {
-            GPSData data = unpack_data(metrics.buffer.data());
-            metrics.buffer.erase(metrics.buffer.begin(), metrics.buffer.begin() + MSG_SIZE);
+        while (metrics.buffer_tail - metrics.buffer_head >= MSG_SIZE) {
+            if (memcmp(metrics.buffer.data() + metrics.buffer_head, SYNC, SYNC_SIZE) != 0) {
+                // Out of sync: skip to the next sync word
+                metrics.corrupted_packets++;
+                auto end = metrics.buffer.begin() + metrics.buffer_tail;
+                auto next = std::search(metrics.buffer.begin() + metrics.buffer_head + 1,
+                                        end, SYNC, SYNC + SYNC_SIZE);
+                if (next == end) {
+                    next -= SYNC_SIZE - 1;  // Keep a sync word split across reads
+                }
+                metrics.buffer_head = next - metrics.buffer.begin();
+                continue;
+            }
+            
+            GPSData data = unpack_data(metrics.buffer.data(), metrics.buffer_head);
+            metrics.buffer_head += MSG_SIZE;
             
             double latency = calculate_latency(data.timestamp);
             
@@ -193,6 +258,13 @@ void start_receiver() {
             old_coords = std::to_string(data.lat) + ", " + std::to_string(data.lon);
             display(data, latency, avg_delay, old_coords, address);
         }
+        
+        // Compact lazily so consuming a message is just an offset bump
+        if (metrics.buffer_head == metrics.buffer_tail) {
+            metrics.buffer_head = metrics.buffer_tail = 0;
+        } else if (metrics.buffer_head > BUFFER_COMPACT_THRESHOLD) {
+            compact_buffer();
+        }
     }
     
     close(new_socket);
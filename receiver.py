@@ -1,22 +1,111 @@
-from socket import socket, AF_INET, SOCK_STREAM, SOL_SOCKET, SO_REUSEADDR
-from datetime import datetime
-import struct
+from socket import (socket, AF_INET, SOCK_STREAM, SOCK_DGRAM, SOL_SOCKET, SO_REUSEADDR,
+                    SO_RCVBUF, IPPROTO_TCP, TCP_NODELAY)
 import os
-from statistics import mean
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import threading
 import time
-import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
 import traceback
+import hashlib
+import json
+import gzip
+from array import array
+from collections import deque
+from protocol import MSG_STRUCT, MSG_SIZE, SYNC, COORD_SCALE, RECEIVER_PORT, TRANSPORT
 
 # Constants
-MSG_FORMAT = "!fffd"  # lat(float), lon(float), alt(float), timestamp(double)
-MSG_SIZE = struct.calcsize(MSG_FORMAT)  # 24 bytes
 DELAY_WINDOW = 5
+RECV_SIZE = 65536  # Bytes per recv(); drains many messages per syscall
+RECV_BUFFER_SIZE = 4 * RECV_SIZE  # Preallocated receive buffer that recv_into() fills
+BUFFER_COMPACT_THRESHOLD = RECV_BUFFER_SIZE // 2  # Move unread bytes to the front past this
 HTTP_PORT = 8080
+GZIP_MIN_SIZE = 1024  # Smaller responses are not worth compressing
+GZIP_LEVEL = 6
+TABLE_ROWS = 10  # Recent points shown in the dashboard table
+SOCKET_RCVBUF = 12 * 1024 * 1024  # Kernel receive buffer; needs net.core.rmem_max >= 12582912
+LISTEN_BACKLOG = 8  # Lets a reconnecting sender queue while the old connection closes
 KML_FILE = "gps_path.kml"
+KML_HEADER = b"""<?xml version="1.0" encoding="UTF-8"?>
+<kml xmlns="http://www.opengis.net/kml/2.2">
+<Document>
+<Placemark>
+<name>GPS Path</name>
+<LineString>
+<coordinates>
+"""
+KML_FOOTER = b"""</coordinates>
+</LineString>
+</Placemark>
+</Document>
+</kml>
+"""
+
+# SVG path plot
+PLOT_WIDTH = 1000
+PLOT_HEIGHT = 600
+PLOT_MARGIN = 40
+PLOT_MAX_POINTS = 1000  # Polyline vertices; the SVG is only ~1000px wide anyway
+
+# Console status display
+DISPLAY_INTERVAL = 0.2  # Seconds between redraws (5 Hz)
+CLEAR_SCREEN = "\x1b[2J\x1b[H"  # ANSI clear + home, avoids forking `clear`
+STATUS_TEMPLATE = """
+        GPS RECEIVER STATUS
+        -------------------------------------
+        | Connected To: {client}
+        | Valid Packets: {valid}
+        | Invalid Packets: {invalid}
+        | Buffer Size: {buffered} bytes
+        -------------------------------------
+        | Current Position:
+{position}
+        -------------------------------------
+        | Performance:
+        | Current Delay: {current_delay:.2f}ms
+        | Avg Delay (Last 5): {avg_delay:.2f}ms
+        -------------------------------------
+        | Web Interface: http://localhost:{http_port}
+        | Path Points: {path_points}
+        | Last Update: {last_update}
+        -------------------------------------
+        
+"""
+POSITION_TEMPLATE = """        | Latitude: {lat:.6f}
+        | Longitude: {lon:.6f}
+        | Altitude: {alt:.1f}m"""
+POSITION_EPSILON = 1e-6  # Degrees; smaller moves don't change the printed position
+ALTITUDE_EPSILON = 0.05  # Meters
+
+# Static parts of the dashboard page, encoded once at import
+HTML_HEAD = b"""<!DOCTYPE html>
+<html>
+<head>
+    <title>GPS Tracker</title>
+    <meta http-equiv="refresh" content="2">
+    <style>
+        body { font-family: Arial, sans-serif; padding: 20px; }
+        .container { max-width: 1000px; margin: 0 auto; }
+        .status { background: #f5f5f5; padding: 10px; border-radius: 5px; }
+        .plot-container { margin: 20px 0; text-align: center; }
+        img { max-width: 100%; border: 1px solid #ddd; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>GPS Path Tracking</h1>
+        """
+HTML_TAIL = b"""
+    </div>
+</body>
+</html>"""
+TABLE_HEAD = b"""
+        <table>
+            <tr><th>Time</th><th>Latitude</th><th>Longitude</th><th>Altitude</th></tr>
+            """
+TABLE_TAIL = b"""
+        </table>"""
 
 # Valid coordinate ranges
 MIN_LAT = -90
@@ -35,187 +124,275 @@ class GPSData:
 
 class GPSReceiver:
     def __init__(self):
-        self.gps_path = []
+        # Path stored as parallel flat arrays rather than a list of GPSData objects
+        self.path_lats = array('d')
+        self.path_lons = array('d')
+        self.kml_coords = bytearray()  # KML <coordinates> body, extended one line per point
+        self.path_json_cache = (0, b'{"lon":[],"lat":[]}')  # (point count, encoded JSON)
         self.lock = threading.Lock()
         self.total_bytes = 0
         self.valid_packets = 0
         self.invalid_packets = 0
-        self.delay_avg = []
+        # Sliding window of recent delays as a ring buffer with a running sum
+        self.delay_ring = [0.0] * DELAY_WINDOW
+        self.delay_index = 0
+        self.delay_count = 0
+        self.delay_sum = 0.0
         self.client_addr = None
         self.last_update = time.time()
-        self.plot_img = None
-        self.buffer = bytearray()
+        self.plot_cache = (0, None, None)  # (point count, SVG bytes, ETag)
+        self.plot_render_lock = threading.Lock()  # One render at a time; held apart from self.lock
+        self.recent_rows = deque(maxlen=TABLE_ROWS)  # Pre-encoded <tr> rows, newest first
+        self.latest_fix = None  # (GPSData, current delay, avg delay), drawn by display_worker
+        self.shown_position = (0.0, 0.0, 0.0)
+        self.position_text = None
+        # Fixed receive buffer: bytes [read_offset, write_offset) are unread
+        self.buffer = bytearray(RECV_BUFFER_SIZE)
+        self.buffer_view = memoryview(self.buffer)
+        self.read_offset = 0
+        self.write_offset = 0
 
-    def validate_coordinates(self, lat, lon, alt):
-        """Validate GPS coordinates are within reasonable ranges"""
+    def validate_fix(self, lat, lon, alt, timestamp, now):
+        """Check coordinates and timestamp in a single expression"""
         return (MIN_LAT <= lat <= MAX_LAT and
                 MIN_LON <= lon <= MAX_LON and
-                MIN_ALT <= alt <= MAX_ALT)
+                MIN_ALT <= alt <= MAX_ALT and
+                1577836800 <= timestamp <= now + 3600)  # 2020 onwards, up to 1hr ahead
 
-    def validate_timestamp(self, timestamp):
-        """Validate timestamp is within reasonable range"""
-        current_time = time.time()
-        return 1577836800 <= timestamp <= current_time + 3600  # 2020-2023 + 1hr
+    def receive(self, conn):
+        """Read straight into the free tail of the buffer; returns 0 when the peer closes"""
+        if self.write_offset + RECV_SIZE > RECV_BUFFER_SIZE:
+            self.compact_buffer()
+        n = conn.recv_into(self.buffer_view[self.write_offset:self.write_offset + RECV_SIZE])
+        self.write_offset += n
+        self.total_bytes += n
+        return n
 
-    def unpack_and_validate(self, binary_data):
-        """Unpack and validate GPS data with comprehensive checks"""
-        try:
-            if len(binary_data) != MSG_SIZE:
-                raise ValueError(f"Invalid size: expected {MSG_SIZE}, got {len(binary_data)}")
-            
-            lat, lon, alt, timestamp = struct.unpack(MSG_FORMAT, binary_data)
-            
-            if not self.validate_coordinates(lat, lon, alt):
-                raise ValueError(f"Invalid coordinates: lat={lat}, lon={lon}, alt={alt}")
-            
-            if not self.validate_timestamp(timestamp):
-                raise ValueError(f"Invalid timestamp: {timestamp}")
-            
-            return GPSData(lat, lon, alt, timestamp)
-            
-        except struct.error as e:
-            raise ValueError(f"Unpack error: {e}")
-        except Exception as e:
-            raise ValueError(f"Validation error: {e}")
+    def receive_datagram(self, sock):
+        """Read one datagram into the empty buffer; returns its size"""
+        # Datagrams carry whole messages, so a truncated tail never continues in the next one
+        self.read_offset = 0
+        n, addr = sock.recvfrom_into(self.buffer_view[:RECV_SIZE])
+        self.write_offset = n
+        self.total_bytes += n
+        self.client_addr = addr[0]
+        return n
+
+    def compact_buffer(self):
+        """Move the unread bytes to the front of the buffer"""
+        remaining = self.write_offset - self.read_offset
+        self.buffer[:remaining] = self.buffer[self.read_offset:self.write_offset]
+        self.read_offset = 0
+        self.write_offset = remaining
 
     def process_buffer(self):
         """Process all complete messages in the buffer"""
-        while len(self.buffer) >= MSG_SIZE:
-            message = self.buffer[:MSG_SIZE]
+        now = time.time()  # One clock read covers every message from this recv()
+        while self.write_offset - self.read_offset >= MSG_SIZE:
+            # Decode every whole message in one iter_unpack pass, stopping at the first bad one
+            end = self.write_offset - (self.write_offset - self.read_offset) % MSG_SIZE
+            lats, lons, alts, times = [], [], [], []
+            for sync, lat_e7, lon_e7, alt, timestamp in MSG_STRUCT.iter_unpack(
+                    self.buffer_view[self.read_offset:end]):
+                lat, lon = lat_e7 / COORD_SCALE, lon_e7 / COORD_SCALE
+                if sync != SYNC or not self.validate_fix(lat, lon, alt, timestamp, now):
+                    break
+                lats.append(lat)
+                lons.append(lon)
+                alts.append(alt)
+                times.append(timestamp)
             
-            try:
-                data = self.unpack_and_validate(message)
-                self.valid_packets += 1
-                self.buffer = self.buffer[MSG_SIZE:]
-                self.handle_valid_data(data)
-            except ValueError as e:
+            if times:
+                self.valid_packets += len(times)
+                self.read_offset += len(times) * MSG_SIZE
+                self.handle_batch(lats, lons, alts, times, now)
+            if self.read_offset < end:
                 self.invalid_packets += 1
-                print(f"Bad data: {e}")
+                print(f"Bad data at offset {self.read_offset}")
                 self.resync_buffer()
+        
+        # Compact lazily so consuming a message is just an offset bump
+        if self.read_offset == self.write_offset:
+            self.read_offset = self.write_offset = 0
+        elif self.read_offset > BUFFER_COMPACT_THRESHOLD:
+            self.compact_buffer()
 
     def resync_buffer(self):
-        """Attempt to resync by finding the next valid message start"""
-        sync_found = False
-        for i in range(1, len(self.buffer)):
-            try:
-                potential_msg = self.buffer[i:i+MSG_SIZE]
-                if len(potential_msg) < MSG_SIZE:
-                    break
-                    
-                data = self.unpack_and_validate(potential_msg)
-                print(f"Resynced at offset {i}")
-                self.buffer = self.buffer[i:]
-                sync_found = True
-                break
-            except ValueError:
-                continue
+        """Skip ahead to the next sync word after the current message start"""
+        idx = self.buffer.find(SYNC, self.read_offset + 1, self.write_offset)
+        if idx < 0:
+            # Keep a sync word that may be split across recv() calls
+            self.read_offset = self.write_offset - (len(SYNC) - 1)
+            return
         
-        if not sync_found:
-            self.buffer.clear()
+        print(f"Resynced at offset {idx - self.read_offset}")
+        self.read_offset = idx
 
-    def handle_valid_data(self, data):
-        """Process validated GPS data"""
-        current_delay = self.calculate_latency(data.timestamp)
+    def handle_batch(self, lats, lons, alts, times, now):
+        """Record a run of validated GPS fixes under a single lock acquisition"""
+        # Older samples would be pushed out of the delay window by this same batch
+        for timestamp in times[-DELAY_WINDOW:]:
+            current_delay = self.calculate_latency(timestamp, now)
+            avg_delay = self.update_delay_average(current_delay)
         
-        self.delay_avg.append(current_delay)
-        if len(self.delay_avg) > DELAY_WINDOW:
-            self.delay_avg.pop(0)
-        avg_delay = mean(self.delay_avg) if self.delay_avg else 0
+        # Only the newest TABLE_ROWS fixes can reach the points table
+        rows = [self.format_row(*fix) for fix in
+                zip(lats[-TABLE_ROWS:], lons[-TABLE_ROWS:], alts[-TABLE_ROWS:], times[-TABLE_ROWS:])]
+        kml = "".join(f"{lon},{lat},{alt}\n" for lon, lat, alt in zip(lons, lats, alts)).encode('utf-8')
         
         with self.lock:
-            self.gps_path.append(data)
-            self.last_update = time.time()
-            
-            if len(self.gps_path) % 5 == 0 or len(self.gps_path) == 1:
-                self.generate_plot_image()
+            self.path_lats.extend(lats)
+            self.path_lons.extend(lons)
+            self.kml_coords += kml
+            self.recent_rows.extendleft(rows)
+            self.last_update = now
         
-        self.display_status(data, current_delay, avg_delay)
+        # Single assignment; no lock needed
+        self.latest_fix = (GPSData(lats[-1], lons[-1], alts[-1], times[-1]), current_delay, avg_delay)
 
-    def calculate_latency(self, sent_ts):
-        """Compute latency in milliseconds"""
-        return round((time.time() - sent_ts) * 1000, 2)
+    def format_row(self, lat, lon, alt, timestamp):
+        """Render one fix as a pre-encoded points-table row"""
+        return (
+            f"<tr><td>{time.strftime('%H:%M:%S', time.localtime(timestamp))}</td>"
+            f"<td>{lat:.6f}</td>"
+            f"<td>{lon:.6f}</td>"
+            f"<td>{alt:.1f}m</td></tr>"
+        ).encode('utf-8')
+
+    def update_delay_average(self, delay):
+        """Add a delay sample and return the mean of the last DELAY_WINDOW samples"""
+        self.delay_sum += delay - self.delay_ring[self.delay_index]
+        self.delay_ring[self.delay_index] = delay
+        self.delay_index = (self.delay_index + 1) % DELAY_WINDOW
+        if self.delay_count < DELAY_WINDOW:
+            self.delay_count += 1
+        return self.delay_sum / self.delay_count
+
+    def calculate_latency(self, sent_ts, now):
+        """Compute latency in milliseconds; rounding is left to the display format"""
+        return (now - sent_ts) * 1000.0
 
     def display_status(self, data, current_delay, avg_delay):
         """Display current status in console"""
-        os.system('cls' if os.name == 'nt' else 'clear')
-        print(f"""
-        GPS RECEIVER STATUS
-        -------------------------------------
-        | Connected To: {self.client_addr or 'None'}
-        | Valid Packets: {self.valid_packets}
-        | Invalid Packets: {self.invalid_packets}
-        | Buffer Size: {len(self.buffer)} bytes
-        -------------------------------------
-        | Current Position:
-        | Latitude: {data.lat:.6f}
-        | Longitude: {data.lon:.6f}
-        | Altitude: {data.alt:.1f}m
-        -------------------------------------
-        | Performance:
-        | Current Delay: {current_delay:.2f}ms
-        | Avg Delay (Last 5): {avg_delay:.2f}ms
-        -------------------------------------
-        | Web Interface: http://localhost:{HTTP_PORT}
-        | Path Points: {len(self.gps_path)}
-        | Last Update: {datetime.fromtimestamp(self.last_update).strftime('%H:%M:%S')}
-        -------------------------------------
-        """)
+        # Reuse the formatted position while the fix is effectively stationary
+        shown_lat, shown_lon, shown_alt = self.shown_position
+        if (self.position_text is None or
+                abs(data.lat - shown_lat) > POSITION_EPSILON or
+                abs(data.lon - shown_lon) > POSITION_EPSILON or
+                abs(data.alt - shown_alt) > ALTITUDE_EPSILON):
+            self.shown_position = (data.lat, data.lon, data.alt)
+            self.position_text = POSITION_TEMPLATE.format(lat=data.lat, lon=data.lon, alt=data.alt)
+        
+        sys.stdout.write(CLEAR_SCREEN + STATUS_TEMPLATE.format(
+            client=self.client_addr or 'None',
+            valid=self.valid_packets,
+            invalid=self.invalid_packets,
+            buffered=self.write_offset - self.read_offset,
+            position=self.position_text,
+            current_delay=current_delay,
+            avg_delay=avg_delay,
+            http_port=HTTP_PORT,
+            path_points=len(self.path_lats),
+            last_update=time.strftime('%H:%M:%S', time.localtime(self.last_update)),
+        ))
+        sys.stdout.flush()
 
-    def generate_plot_image(self):
-        """Generate and cache the latest plot image"""
-        with self.lock:
-            if len(self.gps_path) < 1:
-                self.plot_img = None
-                return
-            
-            plt.figure(figsize=(10, 6))
-            
-            if len(self.gps_path) > 1:
-                plt.plot([p.lon for p in self.gps_path], [p.lat for p in self.gps_path], 
-                        'b-', linewidth=2, label='Path')
-                plt.plot(self.gps_path[0].lon, self.gps_path[0].lat, 
-                        'go', markersize=8, label='Start')
-                plt.plot(self.gps_path[-1].lon, self.gps_path[-1].lat, 
-                        'ro', markersize=8, label='End')
-            else:
-                plt.plot(self.gps_path[0].lon, self.gps_path[0].lat, 
-                        'bo', markersize=8, label='Single Point')
+    def plot_image(self):
+        """Return (SVG bytes, ETag) for the path, re-rendering only when it has grown"""
+        with self.plot_render_lock:
+            with self.lock:
+                count = len(self.path_lons)
+                if count == self.plot_cache[0]:
+                    return self.plot_cache[1:]
+                lons = self.path_lons[:count]
+                lats = self.path_lats[:count]
             
-            plt.xlabel('Longitude')
-            plt.ylabel('Latitude')
-            plt.title(f'GPS Path ({len(self.gps_path)} points)')
-            plt.legend()
-            plt.grid(True)
-            
-            buf = BytesIO()
-            plt.savefig(buf, format='png', bbox_inches='tight', dpi=100)
-            plt.close()
-            buf.seek(0)
-            self.plot_img = base64.b64encode(buf.read()).decode('utf-8')
+            img = self.generate_plot_image(lons, lats)
+            etag = f'"{hashlib.blake2b(img, digest_size=8).hexdigest()}"'
+            self.plot_cache = (count, img, etag)
+            return img, etag
+
+    def display_worker(self):
+        """Redraw the console status every DISPLAY_INTERVAL while new fixes arrive"""
+        shown = None
+        while True:
+            time.sleep(DISPLAY_INTERVAL)
+            latest = self.latest_fix
+            if latest is not shown:
+                shown = latest
+                self.display_status(*latest)
+
+    def generate_plot_image(self, lons, lats):
+        """Render a non-empty path snapshot as an SVG image"""
+        min_lon, max_lon = min(lons), max(lons)
+        min_lat, max_lat = min(lats), max(lats)
+        x_scale = (PLOT_WIDTH - 2 * PLOT_MARGIN) / ((max_lon - min_lon) or 1)
+        y_scale = (PLOT_HEIGHT - 2 * PLOT_MARGIN) / ((max_lat - min_lat) or 1)
+        
+        # Draw at most PLOT_MAX_POINTS + 1 vertices, always ending on the latest fix
+        step = -(-len(lons) // PLOT_MAX_POINTS)  # Ceiling division
+        plot_lons, plot_lats = lons[::step], lats[::step]
+        if (len(lons) - 1) % step:
+            plot_lons.append(lons[-1])
+            plot_lats.append(lats[-1])
+        xs = [PLOT_MARGIN + (lon - min_lon) * x_scale for lon in plot_lons]
+        ys = [PLOT_HEIGHT - PLOT_MARGIN - (lat - min_lat) * y_scale for lat in plot_lats]
+        
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {PLOT_WIDTH} {PLOT_HEIGHT}">',
+            f'<rect width="{PLOT_WIDTH}" height="{PLOT_HEIGHT}" fill="white"/>',
+            f'<text x="{PLOT_WIDTH // 2}" y="24" text-anchor="middle" font-family="Arial">'
+            f'GPS Path ({len(lons)} points)</text>',
+            f'<text x="{PLOT_MARGIN}" y="{PLOT_HEIGHT - 10}" font-size="12">{min_lon:.6f}</text>',
+            f'<text x="{PLOT_WIDTH - PLOT_MARGIN}" y="{PLOT_HEIGHT - 10}" font-size="12" '
+            f'text-anchor="end">{max_lon:.6f}</text>',
+            f'<text x="4" y="{PLOT_HEIGHT - PLOT_MARGIN}" font-size="12">{min_lat:.6f}</text>',
+            f'<text x="4" y="{PLOT_MARGIN}" font-size="12">{max_lat:.6f}</text>',
+        ]
+        if len(xs) > 1:
+            points = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+            parts.append(f'<polyline points="{points}" fill="none" stroke="blue" stroke-width="2"/>')
+            parts.append(f'<circle cx="{xs[0]:.1f}" cy="{ys[0]:.1f}" r="6" fill="green"/>')
+            parts.append(f'<circle cx="{xs[-1]:.1f}" cy="{ys[-1]:.1f}" r="6" fill="red"/>')
+        else:
+            parts.append(f'<circle cx="{xs[0]:.1f}" cy="{ys[0]:.1f}" r="6" fill="blue"/>')
+        parts.append('</svg>')
+        
+        return "".join(parts).encode('utf-8')
+
+    def path_json(self):
+        """Return the path as JSON lon/lat arrays, re-encoding only when it has grown"""
+        with self.lock:
+            count = len(self.path_lons)
+            if count == self.path_json_cache[0]:
+                return self.path_json_cache[1]
+            lons = self.path_lons[:count]
+            lats = self.path_lats[:count]
+        
+        encoded = json.dumps({"lon": lons.tolist(), "lat": lats.tolist()},
+                             separators=(',', ':')).encode('utf-8')
+        with self.lock:
+            if count > self.path_json_cache[0]:
+                self.path_json_cache = (count, encoded)
+        return encoded
+
+    def kml_bytes(self):
+        """Return the current path as a KML document, or None if there are no points"""
+        with self.lock:
+            if not self.kml_coords:
+                return None
+            coords = bytes(self.kml_coords)
+        return KML_HEADER + coords + KML_FOOTER
 
     def save_kml(self):
         """Save current path as KML file"""
-        with self.lock:
-            if not self.gps_path:
-                return
-            
-            with open(KML_FILE, 'w') as f:
-                f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-                f.write('<kml xmlns="http://www.opengis.net/kml/2.2">\n')
-                f.write('<Document>\n')
-                f.write('<Placemark>\n')
-                f.write('<name>GPS Path</name>\n')
-                f.write('<LineString>\n')
-                f.write('<coordinates>\n')
-                
-                for point in self.gps_path:
-                    f.write(f"{point.lon},{point.lat},{point.alt}\n")
-                
-                f.write('</coordinates>\n')
-                f.write('</LineString>\n')
-                f.write('</Placemark>\n')
-                f.write('</Document>\n')
-                f.write('</kml>\n')
+        kml = self.kml_bytes()
+        if kml is None:
+            return
+        
+        with open(KML_FILE, 'wb') as f:
+            f.write(kml)
+        print(f"Saved path to {KML_FILE}")
 
 class HTTPRequestHandler(BaseHTTPRequestHandler):
     protocol_version = 'HTTP/1.1'
@@ -228,6 +405,8 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
                 self.handle_kml_download()
             elif self.path == '/plot':
                 self.handle_plot_image()
+            elif self.path == '/path.json':
+                self.handle_path_json()
             elif self.path == '/favicon.ico':
                 self.handle_favicon()
             else:
@@ -240,48 +419,23 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
         """Handle requests for the main HTML page"""
         try:
             with receiver.lock:
-                path_count = len(receiver.gps_path)
-                last_update = datetime.fromtimestamp(receiver.last_update).strftime('%H:%M:%S')
-                plot_img = receiver.plot_img
+                path_count = len(receiver.path_lats)
+                last_update = receiver.last_update
                 
-            html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>GPS Tracker</title>
-    <meta http-equiv="refresh" content="2">
-    <style>
-        body {{ font-family: Arial, sans-serif; padding: 20px; }}
-        .container {{ max-width: 1000px; margin: 0 auto; }}
-        .status {{ background: #f5f5f5; padding: 10px; border-radius: 5px; }}
-        .plot-container {{ margin: 20px 0; text-align: center; }}
-        img {{ max-width: 100%; border: 1px solid #ddd; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th, td {{ padding: 8px; text-align: left; border-bottom: 1px solid #ddd; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>GPS Path Tracking</h1>
-        
+            body = f"""
         <div class="status">
             <strong>Total points:</strong> {path_count} | 
-            <strong>Last update:</strong> {last_update}
+            <strong>Last update:</strong> {time.strftime('%H:%M:%S', time.localtime(last_update))}
         </div>
         
         <div class="plot-container">
-            {f'<img src="/plot" alt="GPS Path">' if plot_img else '<p>Collecting data... (need at least 1 point)</p>'}
+            {'<img src="/plot" alt="GPS Path">' if path_count else '<p>Collecting data... (need at least 1 point)</p>'}
         </div>
-        
-        {self.generate_points_table()}
-    </div>
-</body>
-</html>"""
+        """.encode('utf-8') + self.generate_points_table()
 
             self.send_response(200)
             self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.send_header('Content-Length', str(len(html)))
-            self.end_headers()
-            self.wfile.write(html.encode('utf-8'))
+            self.send_body(HTML_HEAD + body + HTML_TAIL)
         except Exception as e:
             print(f"Error generating page: {e}")
             self.send_error(500, "Page generation failed")
@@ -290,66 +444,91 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
         """Generate HTML table of recent points"""
         try:
             with receiver.lock:
-                if not receiver.gps_path:
-                    return ""
-                
-                points = receiver.gps_path[-10:][::-1]  # Last 10 points, newest first
-                rows = "".join(
-                    f"<tr><td>{datetime.fromtimestamp(p.timestamp).strftime('%H:%M:%S')}</td>"
-                    f"<td>{p.lat:.6f}</td>"
-                    f"<td>{p.lon:.6f}</td>"
-                    f"<td>{p.alt:.1f}m</td></tr>"
-                    for p in points
-                )
-                
-                return f"""
-                <table>
-                    <tr><th>Time</th><th>Latitude</th><th>Longitude</th><th>Altitude</th></tr>
-                    {rows}
-                </table>"""
+                rows = tuple(receiver.recent_rows)
+            
+            if not rows:
+                return b""
+            return TABLE_HEAD + b"".join(rows) + TABLE_TAIL
         except Exception as e:
             print(f"Error generating points table: {e}")
-            return ""
+            return b""
 
     def handle_plot_image(self):
         """Handle requests for the plot image"""
         try:
-            with receiver.lock:
-                if not receiver.plot_img:
-                    self.send_error(404, "No plot available")
-                    return
-                
-                img_data = base64.b64decode(receiver.plot_img)
-                self.send_response(200)
-                self.send_header('Content-type', 'image/png')
-                self.send_header('Content-Length', str(len(img_data)))
+            # Renders outside receiver.lock; a slow client must not stall the receive loop
+            img_data, etag = receiver.plot_image()
+            
+            if not img_data:
+                self.send_error(404, "No plot available")
+                return
+            
+            # The gzipped and identity bodies differ, so each gets its own ETag
+            if self.accepts_gzip(img_data):
+                etag = etag[:-1] + '-gz"'
+            
+            # Let the page's periodic refresh revalidate instead of re-downloading
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Vary', 'Accept-Encoding')
                 self.end_headers()
-                self.wfile.write(img_data)
+                return
+            
+            self.send_response(200)
+            self.send_header('Content-type', 'image/svg+xml')
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_body(img_data)
         except Exception as e:
             print(f"Error serving plot: {e}")
             self.send_error(500, "Plot generation failed")
 
+    def handle_path_json(self):
+        """Handle requests for the raw path coordinates as JSON"""
+        try:
+            body = receiver.path_json()
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_body(body)
+        except Exception as e:
+            print(f"Error serving path JSON: {e}")
+            self.send_error(500, "Path JSON generation failed")
+
     def handle_kml_download(self):
-        """Handle requests for KML file download"""
+        """Handle requests for KML file download, served from memory"""
         try:
-            receiver.save_kml()
-            with open(KML_FILE, 'rb') as f:
-                kml_data = f.read()
-                self.send_response(200)
-                self.send_header('Content-type', 'application/vnd.google-earth.kml+xml')
-                self.send_header('Content-Disposition', f'attachment; filename="{KML_FILE}"')
-                self.send_header('Content-Length', str(len(kml_data)))
-                self.end_headers()
-                self.wfile.write(kml_data)
-        except FileNotFoundError:
-            self.send_error(404, "KML file not found")
+            kml_data = receiver.kml_bytes()
+            if kml_data is None:
+                self.send_error(404, "No path recorded yet")
+                return
+            
+            self.send_response(200)
+            self.send_header('Content-type', 'application/vnd.google-earth.kml+xml')
+            self.send_header('Content-Disposition', f'attachment; filename="{KML_FILE}"')
+            self.send_body(kml_data)
         except Exception as e:
             print(f"Error serving KML: {e}")
             self.send_error(500, "KML generation failed")
 
+    def accepts_gzip(self, body):
+        """Whether send_body will gzip `body` for this request"""
+        return len(body) >= GZIP_MIN_SIZE and 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def send_body(self, body):
+        """Finish the headers and write `body`, gzipped when the client accepts it"""
+        if self.accepts_gzip(body):
+            body = gzip.compress(body, GZIP_LEVEL)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def handle_favicon(self):
         """Handle favicon requests to prevent 404 errors"""
         self.send_response(404)
+        self.send_header('Content-Length', '0')  # Lets the browser reuse the connection
         self.end_headers()
 
     def log_message(self, format, *args):
@@ -359,7 +538,7 @@ class HTTPRequestHandler(BaseHTTPRequestHandler):
 def start_http_server():
     """Start the HTTP server with proper error handling"""
     server_address = ('', HTTP_PORT)
-    httpd = HTTPServer(server_address, HTTPRequestHandler)
+    httpd = ThreadingHTTPServer(server_address, HTTPRequestHandler)  # A slow client only ties up its own thread
     print(f"HTTP server running on port {HTTP_PORT}")
     try:
         httpd.serve_forever()
@@ -368,59 +547,89 @@ def start_http_server():
     finally:
         httpd.server_close()
 
+def serve_tcp():
+    """Accept one sender at a time and stream its messages"""
+    with socket(AF_INET, SOCK_STREAM) as s:
+        # Set socket options before binding
+        s.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+        # Accepted connections inherit these, so set them before listen()
+        s.setsockopt(SOL_SOCKET, SO_RCVBUF, SOCKET_RCVBUF)
+        s.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        s.bind(('0.0.0.0', RECEIVER_PORT))
+        s.listen(LISTEN_BACKLOG)
+        print("GPS receiver waiting for connection...")
+        
+        while True:
+            conn, addr = None, None
+            try:
+                conn, addr = s.accept()
+                conn.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+                conn.setsockopt(SOL_SOCKET, SO_RCVBUF, SOCKET_RCVBUF)
+                receiver.client_addr = addr[0]
+                print(f"Connected to {addr}")
+                
+                with conn:
+                    while True:
+                        try:
+                            if not receiver.receive(conn):
+                                break
+                                
+                            receiver.process_buffer()
+                            
+                        except ConnectionResetError:
+                            print("Connection reset by peer")
+                            break
+                        except Exception as e:
+                            print(f"Data processing error: {e}")
+                            break
+                        
+            except OSError as e:
+                print(f"Socket error: {e}")
+            finally:
+                if conn:
+                    conn.close()
+                print("Connection closed")
+                receiver.client_addr = None
+
+def serve_udp():
+    """Receive datagrams of whole messages from any sender"""
+    with socket(AF_INET, SOCK_DGRAM) as s:
+        # No SO_REUSEADDR: UDP has no TIME_WAIT, and it would let a second receiver bind the port
+        s.setsockopt(SOL_SOCKET, SO_RCVBUF, SOCKET_RCVBUF)
+        s.bind(('0.0.0.0', RECEIVER_PORT))
+        print("GPS receiver listening for UDP datagrams...")
+        
+        while True:
+            try:
+                receiver.receive_datagram(s)
+                receiver.process_buffer()
+            except OSError as e:
+                print(f"Socket error: {e}")
+
 def start_receiver():
     global receiver
     receiver = GPSReceiver()
     
+    if os.name == 'nt':
+        os.system('')  # One-time call that enables ANSI escape handling in the Windows console
+    
     # Start HTTP server in a separate thread
     http_thread = threading.Thread(target=start_http_server, daemon=True)
     http_thread.start()
     
-    with socket(AF_INET, SOCK_STREAM) as s:
-        # Set socket options before binding
-        s.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
-        s.bind(('0.0.0.0', 40739))
-        s.listen(1)
-        print("GPS receiver waiting for connection...")
-        
-        try:
-            while True:
-                conn, addr = None, None
-                try:
-                    conn, addr = s.accept()
-                    receiver.client_addr = addr[0]
-                    print(f"Connected to {addr}")
-                    
-                    with conn:
-                        while True:
-                            try:
-                                chunk = conn.recv(4096)
-                                if not chunk:
-                                    break
-                                    
-                                receiver.total_bytes += len(chunk)
-                                receiver.buffer.extend(chunk)
-                                receiver.process_buffer()
-                                
-                            except ConnectionResetError:
-                                print("Connection reset by peer")
-                                break
-                            except Exception as e:
-                                print(f"Data processing error: {e}")
-                                break
-                            
-                except OSError as e:
-                    print(f"Socket error: {e}")
-                finally:
-                    if conn:
-                        conn.close()
-                    print("Connection closed")
-                    receiver.client_addr = None
-                    
-        except KeyboardInterrupt:
-            print("Shutting down...")
-        finally:
-            s.close()
+    # Draw the console from its own thread so terminal writes never delay recv()
+    display_thread = threading.Thread(target=receiver.display_worker, daemon=True)
+    display_thread.start()
+    
+    try:
+        if TRANSPORT == 'udp':
+            serve_udp()
+        else:
+            serve_tcp()
+    except KeyboardInterrupt:
+        print("Shutting down...")
+    finally:
+        receiver.save_kml()  # The path lives in memory until here; /kml serves it meanwhile
 
 if __name__ == "__main__":
     start_receiver()
@@ -1,37 +1,60 @@
 import socket
-import struct
 from datetime import datetime
 import serial  # For GPS module
-import os
+import sys
+import time
+from protocol import RECEIVER_PORT, RECONNECT_DELAY, RECONNECT_MAX_DELAY, connect, pack_message
 
 # Configuration
 RECEIVER_IP = "172.16.18.74"  # Replace with receiver IP
-RECEIVER_PORT = 8080
 GPS_PORT = "/dev/ttyACM0"     # Typical GPS device
 GPS_BAUD = 9600               # Common baud rate for GPS modules
-MSG_FORMAT = "!fffd"          # lat(float), lon(float), alt(float), timestamp(double)
-MSG_SIZE = struct.calcsize(MSG_FORMAT)
+SEND_INTERVAL = 1  # Seconds between fixes; typical GPS update rate is 1Hz
+DISPLAY_INTERVAL = 0.2  # Seconds between console redraws
+CLEAR_SCREEN = "\x1b[2J\x1b[H"  # ANSI clear + cursor home; no subprocess per redraw
+
+def _parse_ddmm(value, degree_digits):
+    """Convert an NMEA (D)DDMM.MMMM field to decimal degrees"""
+    return int(value[:degree_digits]) + float(value[degree_digits:]) / 60
+
+def _checksum_ok(raw):
+    """Verify the *hh XOR checksum that ends an NMEA sentence"""
+    star = raw.rfind(b'*')
+    if star < 0:
+        return False
+    checksum = 0
+    for byte in raw[1:star]:
+        checksum ^= byte
+    try:
+        return checksum == int(raw[star + 1:star + 3], 16)
+    except ValueError:
+        return False
 
 def get_gps_coordinates():
     """Read real GPS data from serial connection"""
     with serial.Serial(GPS_PORT, GPS_BAUD, timeout=1) as ser:
         while True:
-            line = ser.readline().decode('ascii', errors='ignore').strip()
-            if line.startswith('$GPGGA'):  # Standard NMEA sentence
-                try:
-                    parts = line.split(',')
-                    lat = float(parts[2][:2]) + float(parts[2][2:])/60
-                    if parts[3] == 'S': lat *= -1
-                    lon = float(parts[4][:3]) + float(parts[4][3:])/60
-                    if parts[5] == 'W': lon *= -1
-                    return lat, lon, float(parts[9])  # Altitude in meters
-                except (IndexError, ValueError):
+            raw = ser.readline()
+            if not raw.startswith(b'$GPGGA,'):  # Skip other sentences without decoding them
+                continue
+            if not _checksum_ok(raw):  # Corrupted line; the next fix is a second away
+                continue
+            try:
+                parts = raw.decode('ascii', errors='ignore').split(',')
+                lat = _parse_ddmm(parts[2], 2)
+                if parts[3] == 'S': lat *= -1
+                lon = _parse_ddmm(parts[4], 3)
+                if parts[5] == 'W': lon *= -1
+                # Out-of-range values can't be packed as 1e-7 degree int32s
+                if not (-90 <= lat <= 90 and -180 <= lon <= 180):
                     continue
+                return lat, lon, float(parts[9]), int(parts[7])  # Altitude in meters, satellites in use
+            except (IndexError, ValueError):
+                continue
 
-def display_sender(lat, lon, alt, timestamp, byte_count):
+def display_sender(lat, lon, alt, timestamp, byte_count, satellites):
     """ASCII display with real-time stats"""
-    os.system('clear')
-    print(f"""
+    sys.stdout.write(CLEAR_SCREEN + f"""
         REAL GPS SENDER
         -------------------------------------
         | Last Update: {datetime.fromtimestamp(timestamp).strftime('%H:%M:%S.%f')[:-3]}
@@ -41,37 +64,56 @@ def display_sender(lat, lon, alt, timestamp, byte_count):
         | Bytes Sent: {byte_count:,}
         -------------------------------------
         | GPS Fix: Active
-        | Satellites: {get_satellite_count()}  # Implement this based on your GPS module
+        | Satellites: {satellites}
         -------------------------------------
     """)
+    sys.stdout.flush()
 
 def send_data():
     byte_count = 0
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((RECEIVER_IP, RECEIVER_PORT))
-        print(f"Connected to {RECEIVER_IP}:{RECEIVER_PORT}")
-        
-        while True:
-            try:
-                # Get real GPS coordinates
-                lat, lon, alt = get_gps_coordinates()
-                timestamp = datetime.now().timestamp()
-                
-                # Pack and send binary data
-                data = struct.pack(MSG_FORMAT, lat, lon, alt, timestamp)
-                s.sendall(data)
-                byte_count += MSG_SIZE
+    next_send = time.monotonic()
+    last_draw = 0.0
+    backoff = RECONNECT_DELAY
+    while True:
+        try:
+            with connect(RECEIVER_IP) as s:
+                print(f"Connected to {RECEIVER_IP}:{RECEIVER_PORT}")
+                backoff = RECONNECT_DELAY
                 
-                # Update display
-                display_sender(lat, lon, alt, timestamp, byte_count)
-                
-                # Throttle to GPS update rate (typically 1Hz)
-                time.sleep(1)  
-                
-            except (serial.SerialException, socket.error) as e:
-                print(f"Error: {e}")
-                time.sleep(5)  # Wait before retrying
-                continue
+                while True:
+                    try:
+                        # Get real GPS coordinates
+                        lat, lon, alt, satellites = get_gps_coordinates()
+                    except serial.SerialException as e:
+                        print(f"GPS error: {e}")
+                        time.sleep(5)  # Wait before retrying
+                        continue
+                    timestamp = time.time()
+                    
+                    # One fix per second is too slow to batch; send each frame as soon as it is read
+                    frame = pack_message(lat, lon, alt, timestamp)
+                    s.sendall(frame)
+                    byte_count += len(frame)
+                    now = time.monotonic()
+                    
+                    # Update display, at most once per DISPLAY_INTERVAL
+                    if now - last_draw >= DISPLAY_INTERVAL:
+                        display_sender(lat, lon, alt, timestamp, byte_count, satellites)
+                        last_draw = now
+                    
+                    # Throttle to the GPS update rate against an absolute deadline, so time
+                    # spent reading and sending doesn't push the rate below 1Hz
+                    next_send += SEND_INTERVAL
+                    sleep_for = next_send - time.monotonic()
+                    if sleep_for > 0:
+                        time.sleep(sleep_for)
+                    else:
+                        next_send = time.monotonic()  # Fell behind; restart the cadence instead of bursting
+                    
+        except socket.error as e:
+            print(f"Error: {e} | Reconnecting in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_DELAY)
 
 if __name__ == "__main__":
     send_data()
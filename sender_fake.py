@@ -1,51 +1,98 @@
 import socket
-import struct
-from datetime import datetime
+import queue
+import threading
+import time
 import random  # Only needed for fake GPS
+from protocol import (MSG_SIZE, RECEIVER_PORT, TRANSPORT, DATAGRAM_SIZE, SOCKET_SNDBUF, RECONNECT_DELAY,
+                      RECONNECT_MAX_DELAY, connect, pack_message)
 
 # Configuration
 DELAY = 1
 RECEIVER_IP = "172.16.18.74"
-RECEIVER_PORT = 40739
-MSG_FORMAT = "!fffd"  # lat(float), lon(float), alt(float), timestamp(double)
-MSG_SIZE = struct.calcsize(MSG_FORMAT)  # 24 bytes
+# Whole frames per send: about one 16 KiB write on TCP, never more than the send buffer holds,
+# and one unfragmented datagram on UDP
+SEND_BATCH_SIZE = DATAGRAM_SIZE if TRANSPORT == "udp" else min(16384, SOCKET_SNDBUF) // MSG_SIZE * MSG_SIZE
+SEND_QUEUE_SIZE = 1024  # Frames held while the link is slow or down; oldest dropped first
+LOG_INTERVAL = 1.0  # Seconds between progress lines; one line summarizes every frame since
 
 def pack_data(lat, lon, alt=10.0):
     """Pack coordinates into fixed-size binary"""
-    timestamp = datetime.now().timestamp()
-    return struct.pack(MSG_FORMAT, lat, lon, alt, timestamp)
+    timestamp = time.time()
+    return pack_message(lat, lon, alt, timestamp)
 
 def send_gps_data():
     """Real GPS version (using your GPS module)"""
     # Replace with your actual GPS reading code
     lat, lon = read_gps_module()  # Implement this
-    return pack_data(lat, lon)
+    return lat, pack_data(lat, lon)
 
 def send_fake_data():
     """Simulated GPS version"""
-    lat = round(random.uniform(-90, 90), 6)
-    lon = round(random.uniform(-180, 180), 6)
-    return pack_data(lat, lon)
+    # No round(): packing to 1e-7 degree fixed point already limits the precision on the wire
+    lat = random.uniform(-90, 90)
+    lon = random.uniform(-180, 180)
+    return lat, pack_data(lat, lon)
+
+def send_worker(frames):
+    """Own the connection: send queued frames in batches and reconnect on failure"""
+    backoff = RECONNECT_DELAY
+    while True:
+        try:
+            with connect(RECEIVER_IP) as s:
+                print(f"Connected to {RECEIVER_IP}:{RECEIVER_PORT}")
+                backoff = RECONNECT_DELAY
+                
+                while True:
+                    # Block for one frame, then take whatever else is already queued
+                    batch = bytearray(frames.get())
+                    while len(batch) < SEND_BATCH_SIZE:
+                        try:
+                            batch += frames.get_nowait()
+                        except queue.Empty:
+                            break
+                    s.sendall(batch)
+                    
+        except socket.error as e:
+            # Keep the one connection for the whole run; only a failure opens a new one
+            print(f"Error: {e} | Reconnecting in {backoff}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_DELAY)
 
 def start_sender(use_real_gps=True):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((RECEIVER_IP, RECEIVER_PORT))
-        print(f"Connected to {RECEIVER_IP}:{RECEIVER_PORT}")
+    # Socket I/O runs on its own thread so a slow send never delays the next fix
+    frames = queue.Queue(maxsize=SEND_QUEUE_SIZE)
+    threading.Thread(target=send_worker, args=(frames,), daemon=True).start()
+    
+    next_send = time.monotonic()
+    last_log = next_send - LOG_INTERVAL  # Log the first frame right away
+    queued = 0
+    while True:
+        # Choose data source
+        lat, binary_data = send_gps_data() if use_real_gps else send_fake_data()
         
-        while True:
+        try:
+            frames.put_nowait(binary_data)
+        except queue.Full:
+            # Telemetry wants the latest fixes: drop the oldest queued frame instead
             try:
-                # Choose data source
-                binary_data = send_gps_data() if use_real_gps else send_fake_data()
-                
-                # Send exactly MSG_SIZE bytes
-                s.sendall(binary_data)
-                print(f"Sent {len(binary_data)} bytes | Lat: {struct.unpack(MSG_FORMAT, binary_data)[0]:.6f}")
-                
-                time.sleep(DELAY)  # Adjust frequency as needed
-                
-            except (socket.error, struct.error) as e:
-                print(f"Error: {e}")
-                break
+                frames.get_nowait()
+            except queue.Empty:
+                pass
+            frames.put_nowait(binary_data)
+        queued += 1
+        now = time.monotonic()
+        if now - last_log >= LOG_INTERVAL:
+            print(f"Queued {queued} frames ({queued * MSG_SIZE} bytes) | Lat: {lat:.6f}")
+            queued = 0
+            last_log = now
+        
+        # Sleep to the next absolute deadline so work time doesn't stretch the period
+        next_send += DELAY  # Adjust frequency as needed
+        sleep_for = next_send - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        else:
+            next_send = time.monotonic()  # Fell behind; restart the cadence instead of bursting
 
 if __name__ == "__main__":
     start_sender(use_real_gps=False)  # Change to True for real GPS